@@ -1,6 +1,7 @@
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from typing import List
 import logging
 from .models import IngestResponse, AskRequest, AskResponse, MetricsResponse, Citation, Chunk
@@ -15,7 +16,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="AI Policy & Product Helper")
+# orjson serializes responses in C — /api/ask payloads carry full chunk text
+app = FastAPI(title="AI Policy & Product Helper", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -77,16 +79,18 @@ def ingest():
         raise
 
 @app.post("/api/ask", response_model=AskResponse)
-def ask(req: AskRequest):
+async def ask(req: AskRequest):
     """Answer a question using RAG with citations."""
     logger.info(f"Question received: '{req.query}' (k={req.k or 4})")
     try:
-        # Retrieve relevant contexts
-        ctx = engine.retrieve(req.query, k=req.k or 4)
+        # Retrieve relevant contexts; concurrent requests share one
+        # embedding batch via the engine's micro-batcher
+        ctx = await engine.aretrieve(req.query, k=req.k or 4)
         logger.info(f"Retrieved {len(ctx)} relevant chunks")
 
-        # Generate answer
-        answer = engine.generate(req.query, ctx)
+        # Generate answer off the event loop: with LLM_PROVIDER=openai this
+        # is a blocking HTTP call that would otherwise stall every request
+        answer = await run_in_threadpool(engine.generate, req.query, ctx)
         logger.info(f"Generated answer ({len(answer)} chars)")
 
         # Build response
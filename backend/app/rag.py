@@ -1,10 +1,22 @@
-import time, os, math, json, hashlib
+import time, os, math, json, hashlib, sqlite3, pickle, asyncio, threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Tuple
 import numpy as np
 from .settings import settings
 from .ingest import chunk_text, doc_hash
 from qdrant_client import QdrantClient, models as qm
 
+try:
+    import simsimd  # optional SIMD similarity kernels
+except ImportError:
+    simsimd = None
+
+try:
+    import faiss  # optional sublinear ANN index
+except ImportError:
+    faiss = None
+
 # ---- Simple local embedder (deterministic) ----
 def _tokenize(s: str) -> List[str]:
     return [t.lower() for t in s.split()]
@@ -12,16 +24,58 @@ def _tokenize(s: str) -> List[str]:
 class LocalEmbedder:
     def __init__(self, dim: int = 384):
         self.dim = dim
+        # Bump when the hashing scheme changes so stale cache entries are ignored
+        self.cache_tag = f"local-bow2-{dim}"
+        # Fixed odd weights for the position-dependent token hash
+        rng = np.random.default_rng(0x5EED)
+        self._weights = rng.integers(1, 2**31, size=64, dtype=np.int64) * 2 + 1
+
+    def _token_hashes(self, text: str) -> np.ndarray:
+        """Signed-feature buckets for every token, computed without a
+        per-token Python loop: one whitespace scan finds token bounds, a
+        position-weighted byte sum per token is reduced with np.add.reduceat,
+        and a multiplicative mix spreads the sums over the hash space."""
+        arr = np.frombuffer(text.encode("utf-8"), dtype=np.uint8).copy()
+        if arr.size == 0:
+            return arr.astype(np.int64)
+        # ASCII lowercase, so "Refund" and "refund" share a bucket
+        arr[(arr >= 65) & (arr <= 90)] += 32
+        ws = (arr == 0x20) | ((arr >= 0x09) & (arr <= 0x0D))
+        padded = np.empty(len(ws) + 2, dtype=bool)
+        padded[0] = padded[-1] = True
+        padded[1:-1] = ws
+        starts = np.flatnonzero(padded[:-1] & ~padded[1:])
+        if starts.size == 0:
+            return starts.astype(np.int64)
+        ends = np.flatnonzero(~padded[:-1] & padded[1:])
+        lengths = ends - starts
+        # Concatenated token bytes, weighted by position within their token
+        vals = arr[~ws].astype(np.int64)
+        bounds = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        offs_in_tok = np.arange(vals.size) - np.repeat(bounds, lengths)
+        weighted = vals * self._weights[offs_in_tok % 64]
+        sums = np.add.reduceat(weighted, bounds)
+        return sums.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+
+    def _accumulate(self, text: str, out: np.ndarray):
+        h = self._token_hashes(text)
+        if h.size == 0:
+            return
+        buckets = (h >> np.uint64(16)) % self.dim
+        signs = np.where(h & np.uint64(1), np.float32(1.0), np.float32(-1.0))
+        np.add.at(out, buckets.astype(np.intp), signs)
 
     def embed(self, text: str) -> np.ndarray:
-        # Hash-based repeatable pseudo-embedding
-        h = hashlib.sha1(text.encode("utf-8")).digest()
-        rng_seed = int.from_bytes(h[:8], "big") % (2**32-1)
-        rng = np.random.default_rng(rng_seed)
-        v = rng.standard_normal(self.dim).astype("float32")
-        # L2 normalize
-        v = v / (np.linalg.norm(v) + 1e-9)
-        return v
+        v = np.zeros(self.dim, dtype="float32")
+        self._accumulate(text, v)
+        return v / (np.linalg.norm(v) + 1e-9)
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype="float32")
+        for i, t in enumerate(texts):
+            self._accumulate(t, out[i])
+        out /= np.linalg.norm(out, axis=1, keepdims=True) + 1e-9
+        return out
 
 # ---- Sentence Transformer Embedder ----
 class SentenceTransformerEmbedder:
@@ -29,46 +83,276 @@ class SentenceTransformerEmbedder:
         from sentence_transformers import SentenceTransformer
         self.model = SentenceTransformer(model_name)
         self.dim = self.model.get_sentence_embedding_dimension()
+        self.cache_tag = model_name
 
     def embed(self, text: str) -> np.ndarray:
         # Generate semantic embedding
         embedding = self.model.encode(text, convert_to_numpy=True)
         return embedding.astype("float32")
 
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        # Single encode() call so the model batches the forward passes
+        embeddings = self.model.encode(
+            texts,
+            batch_size=64,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        return embeddings.astype("float32")
+
+# ---- Persistent embedding cache ----
+class EmbeddingCache:
+    """
+    Disk-backed cache mapping content-hash keys to embedding vectors.
+    Vectors live in a flat float32 file (memory-mapped on read); a small
+    sqlite index maps key -> row so repeated ingests skip the embedder.
+    """
+    def __init__(self, cache_dir: str, dim: int):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.dim = dim
+        # Vector file and index are keyed by dim: row offsets computed for
+        # one dim would point at garbage if another embedder reused the file
+        self._vec_path = os.path.join(cache_dir, f"embeddings-{dim}.f32")
+        self._db = sqlite3.connect(os.path.join(cache_dir, f"embeddings-{dim}.sqlite3"), check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS rows (key TEXT PRIMARY KEY, row INTEGER NOT NULL)")
+        self._db.commit()
+        # Serializes appends: file offset and row numbers must stay in sync
+        # when concurrent ingests write through the same cache
+        self._lock = threading.Lock()
+
+    def _num_rows(self) -> int:
+        if not os.path.exists(self._vec_path):
+            return 0
+        return os.path.getsize(self._vec_path) // (4 * self.dim)
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        n = self._num_rows()
+        if not keys or n == 0:
+            return {}
+        rows = {}
+        # sqlite caps the number of bound parameters per statement
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i+500]
+            q = "SELECT key, row FROM rows WHERE key IN (%s)" % ",".join("?" * len(batch))
+            rows.update(self._db.execute(q, batch).fetchall())
+        if not rows:
+            return {}
+        mm = np.memmap(self._vec_path, dtype="float32", mode="r", shape=(n, self.dim))
+        return {k: np.array(mm[r]) for k, r in rows.items() if r < n}
+
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        if len(keys) == 0:
+            return
+        with self._lock:
+            start = self._num_rows()
+            with open(self._vec_path, "ab") as f:
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            self._db.executemany(
+                "INSERT OR REPLACE INTO rows (key, row) VALUES (?, ?)",
+                [(k, start + i) for i, k in enumerate(keys)]
+            )
+            self._db.commit()
+
 # ---- Vector store abstraction ----
 class InMemoryStore:
     def __init__(self, dim: int = 384):
         self.dim = dim
-        self.vecs: List[np.ndarray] = []
+        # Rows are L2-normalized then symmetrically quantized to int8 (SQ8):
+        # a per-vector scale dequantizes dot products back to cosine. Quarter
+        # the bytes of float32, which is what a memory-bound sweep pays for.
+        self._A_i8 = np.empty((0, dim), dtype="int8")
+        self._scales = np.empty(0, dtype="float32")
+        self._n = 0
         self.meta: List[Dict] = []
         self._hashes = set()
 
+    @staticmethod
+    def _quantize(v: np.ndarray) -> Tuple[np.ndarray, float]:
+        scale = float(np.abs(v).max()) / 127.0
+        if scale == 0.0:
+            scale = 1.0
+        return np.round(v / scale).astype("int8"), scale
+
     def upsert(self, vectors: List[np.ndarray], metadatas: List[Dict]):
         for v, m in zip(vectors, metadatas):
             h = m.get("hash")
             if h and h in self._hashes:
                 continue
-            self.vecs.append(v.astype("float32"))
+            v = np.asarray(v, dtype="float32")
+            v = v / (np.linalg.norm(v) + 1e-9)
+            if self._n == len(self._A_i8):
+                cap = max(256, 2 * len(self._A_i8))
+                grown = np.empty((cap, self.dim), dtype="int8")
+                grown[:self._n] = self._A_i8[:self._n]
+                self._A_i8 = grown
+                self._scales = np.resize(self._scales, cap)
+            self._A_i8[self._n], self._scales[self._n] = self._quantize(v)
+            self._n += 1
             self.meta.append(m)
             if h:
                 self._hashes.add(h)
 
+    def has_hashes(self, hashes: List[str]) -> List[bool]:
+        return [h in self._hashes for h in hashes]
+
+    def save(self, path: str):
+        """Persist the quantized matrix and metadata under the given prefix."""
+        # Write-then-rename: a loaded store may still mmap the old files, and
+        # truncating a mapped file in place would SIGBUS later searches.
+        np.save(path + ".vecs.tmp.npy", self._A_i8[:self._n])
+        np.save(path + ".scales.tmp.npy", self._scales[:self._n])
+        with open(path + ".meta.tmp.pkl", "wb") as f:
+            pickle.dump({"meta": self.meta, "hashes": self._hashes}, f)
+        os.replace(path + ".vecs.tmp.npy", path + ".vecs.npy")
+        os.replace(path + ".scales.tmp.npy", path + ".scales.npy")
+        os.replace(path + ".meta.tmp.pkl", path + ".meta.pkl")
+
+    def load(self, path: str) -> bool:
+        """Restore a previously saved store; returns True on success."""
+        try:
+            # mmap so rows are only faulted in when a search touches them
+            A = np.load(path + ".vecs.npy", mmap_mode="r")
+            scales = np.load(path + ".scales.npy")
+            with open(path + ".meta.pkl", "rb") as f:
+                state = pickle.load(f)
+        except Exception:
+            return False
+        if A.ndim != 2 or A.shape[1] != self.dim or len(state["meta"]) != len(A):
+            return False
+        self._A_i8 = A
+        self._scales = scales
+        self._n = len(A)
+        self.meta = state["meta"]
+        self._hashes = state["hashes"]
+        return True
+
     def search(self, query: np.ndarray, k: int = 4) -> List[Tuple[float, Dict]]:
-        if not self.vecs:
+        if self._n == 0:
             return []
-        A = np.vstack(self.vecs)  # [N, d]
-        q = query.reshape(1, -1)  # [1, d]
-        # cosine similarity
-        sims = (A @ q.T).ravel() / (np.linalg.norm(A, axis=1) * (np.linalg.norm(q) + 1e-9) + 1e-9)
-        idx = np.argsort(-sims)[:k]
+        q = np.asarray(query, dtype="float32")
+        q = q / (np.linalg.norm(q) + 1e-9)
+        q_i8, q_scale = self._quantize(q)
+        A = self._A_i8[:self._n]
+        if simsimd is not None:
+            dots = np.asarray(simsimd.cdist(q_i8.reshape(1, -1), A, metric="dot")).ravel()
+        else:
+            # int32 accumulation: int16 would overflow at dim=384
+            dots = A.astype(np.int32) @ q_i8.astype(np.int32)
+        # Rescale in place rather than through fresh temporaries
+        sims = dots.astype("float32")
+        sims *= self._scales[:self._n]
+        sims *= q_scale
+        return self._top_k(sims, k)
+
+    def _top_k(self, sims: np.ndarray, k: int) -> List[Tuple[float, Dict]]:
+        # Partial top-k selection (O(N)), then sort only the k winners
+        k_eff = min(k, sims.size)
+        part = np.argpartition(-sims, k_eff - 1)[:k_eff]
+        idx = part[np.argsort(-sims[part])]
         return [(float(sims[i]), self.meta[i]) for i in idx]
 
+    def search_batch(self, queries: np.ndarray, k: int = 4) -> List[List[Tuple[float, Dict]]]:
+        """Search several queries with one int8 matrix-matrix product."""
+        if self._n == 0:
+            return [[] for _ in range(len(queries))]
+        Q = np.asarray(queries, dtype="float32")
+        Q = Q / (np.linalg.norm(Q, axis=1, keepdims=True) + 1e-9)
+        q_i8 = np.empty((len(Q), self.dim), dtype="int8")
+        q_scales = np.empty(len(Q), dtype="float32")
+        for i, q in enumerate(Q):
+            q_i8[i], q_scales[i] = self._quantize(q)
+        dots = q_i8.astype(np.int32) @ self._A_i8[:self._n].astype(np.int32).T
+        sims = dots.astype("float32")
+        sims *= self._scales[:self._n]
+        sims *= q_scales[:, None]
+        return [self._top_k(row, k) for row in sims]
+
+class FaissStore:
+    """
+    FAISS-backed store with the same upsert/search surface as
+    InMemoryStore. Vectors are L2-normalized so inner product equals
+    cosine. Small corpora use an exact flat index; past _IVF_MIN the
+    store rebuilds as IndexIVFFlat (k-means cells, nprobe cells scanned
+    per query), dropping search from O(N) to sublinear.
+    """
+    _IVF_MIN = 1000  # below this, training costs more than a flat scan
+
+    def __init__(self, dim: int = 384, nprobe: int = 8):
+        if faiss is None:
+            raise ImportError("faiss is not installed")
+        self.dim = dim
+        self.nprobe = nprobe
+        self.index = faiss.IndexFlatIP(dim)
+        # Keep the raw rows so the IVF index can be trained when we cross
+        # the threshold (IVF training needs the full sample)
+        self._A = np.empty((0, dim), dtype="float32")
+        self._n = 0
+        self.meta: List[Dict] = []
+        self._hashes = set()
+
+    def _append(self, v: np.ndarray):
+        if self._n == len(self._A):
+            grown = np.empty((max(256, 2 * len(self._A)), self.dim), dtype="float32")
+            grown[:self._n] = self._A[:self._n]
+            self._A = grown
+        self._A[self._n] = v
+        self._n += 1
+
+    def upsert(self, vectors: List[np.ndarray], metadatas: List[Dict]):
+        added = []
+        for v, m in zip(vectors, metadatas):
+            h = m.get("hash")
+            if h and h in self._hashes:
+                continue
+            v = np.asarray(v, dtype="float32")
+            v = v / (np.linalg.norm(v) + 1e-9)
+            self._append(v)
+            added.append(v)
+            self.meta.append(m)
+            if h:
+                self._hashes.add(h)
+        if not added:
+            return
+        if isinstance(self.index, faiss.IndexFlatIP) and self._n >= self._IVF_MIN:
+            # Rebuild as IVF over everything seen so far
+            A = np.ascontiguousarray(self._A[:self._n])
+            nlist = max(1, int(math.sqrt(self._n)))
+            index = faiss.IndexIVFFlat(
+                faiss.IndexFlatIP(self.dim), self.dim, nlist, faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(A)
+            index.add(A)
+            self.index = index
+        else:
+            self.index.add(np.vstack(added))
+
+    def has_hashes(self, hashes: List[str]) -> List[bool]:
+        return [h in self._hashes for h in hashes]
+
+    def search(self, query: np.ndarray, k: int = 4) -> List[Tuple[float, Dict]]:
+        if self._n == 0:
+            return []
+        q = np.asarray(query, dtype="float32")
+        q = q / (np.linalg.norm(q) + 1e-9)
+        if isinstance(self.index, faiss.IndexIVFFlat):
+            self.index.nprobe = self.nprobe
+        D, I = self.index.search(q.reshape(1, -1), min(k, self._n))
+        return [(float(d), self.meta[i]) for d, i in zip(D[0], I[0]) if i >= 0]
+
 class QdrantStore:
     def __init__(self, collection: str, dim: int = 384, url: str = "http://localhost:6333"):
-        self.client = QdrantClient(url=url, timeout=10.0)
         self.collection = collection
         self.dim = dim
-        self._ensure_collection()
+        # gRPC framing is binary, roughly halving small-request latency vs
+        # REST — but it needs port 6334, which older setups may not expose.
+        # Fall back to plain REST rather than losing the Qdrant backend.
+        try:
+            self.client = QdrantClient(url=url, prefer_grpc=True, timeout=10.0)
+            self._ensure_collection()
+        except Exception:
+            self.client = QdrantClient(url=url, timeout=10.0)
+            self._ensure_collection()
 
     @staticmethod
     def _hash_to_id(hash_str: str) -> int:
@@ -86,36 +370,52 @@ class QdrantStore:
             )
 
     def upsert(self, vectors: List[np.ndarray], metadatas: List[Dict]):
-        # Ensure collection exists before upserting
-        self._ensure_collection()
-
+        # One retrieve for the whole batch instead of a round-trip per chunk
+        ids = [self._hash_to_id(m["hash"]) for m in metadatas if m.get("hash")]
+        existing = set()
+        if ids:
+            try:
+                existing = {p.id for p in self.client.retrieve(
+                    collection_name=self.collection,
+                    ids=ids,
+                    with_payload=False,
+                    with_vectors=False
+                )}
+            except Exception:
+                # Collection may be empty/new; treat everything as missing
+                pass
         points = []
         for v, m in zip(vectors, metadatas):
             h = m.get("hash")
             if not h:
                 continue
-            # Use hash-based ID to prevent duplicates
+            # Hash-based IDs prevent duplicates, in-batch included
             point_id = self._hash_to_id(h)
-            # Check if point already exists
-            try:
-                existing = self.client.retrieve(
-                    collection_name=self.collection,
-                    ids=[point_id]
-                )
-                if existing:
-                    # Skip duplicate
-                    continue
-            except Exception:
-                # Point doesn't exist, continue with insertion
-                pass
-            points.append(qm.PointStruct(id=point_id, vector=v.tolist(), payload=m))
+            if point_id in existing:
+                continue
+            existing.add(point_id)
+            points.append(qm.PointStruct(id=point_id, vector=np.asarray(v, dtype=np.float32), payload=m))
         if points:
             self.client.upsert(collection_name=self.collection, points=points)
 
+    def has_hashes(self, hashes: List[str]) -> List[bool]:
+        # Single retrieve round-trip for the whole batch
+        ids = [self._hash_to_id(h) for h in hashes]
+        try:
+            existing = {p.id for p in self.client.retrieve(
+                collection_name=self.collection,
+                ids=ids,
+                with_payload=False,
+                with_vectors=False
+            )}
+        except Exception:
+            return [False] * len(hashes)
+        return [i in existing for i in ids]
+
     def search(self, query: np.ndarray, k: int = 4) -> List[Tuple[float, Dict]]:
         res = self.client.search(
             collection_name=self.collection,
-            query_vector=query.tolist(),
+            query_vector=np.asarray(query, dtype=np.float32),  # client serializes from the buffer
             limit=k,
             with_payload=True
         )
@@ -132,9 +432,23 @@ class StubLLM:
             sec = c.get("section") or "Section"
             lines.append(f"- {c.get('title')} — {sec}")
         lines.append("Summary:")
-        # naive summary of top contexts
-        joined = " ".join([c.get("text", "") for c in contexts])
-        lines.append(joined[:600] + ("..." if len(joined) > 600 else ""))
+        # naive summary of top contexts: concatenate only until the 600-char
+        # budget is spent instead of joining everything and slicing
+        budget = 600
+        buf = []
+        taken = 0
+        truncated = False
+        for c in contexts:
+            t = c.get("text", "")
+            if buf:
+                t = " " + t
+            take = min(len(t), budget - taken)
+            buf.append(t[:take])
+            taken += take
+            if take < len(t):
+                truncated = True
+                break
+        lines.append("".join(buf) + ("..." if truncated else ""))
         return "\n".join(lines)
 
 class OpenAILLM:
@@ -208,6 +522,11 @@ class RAGEngine:
                 self.store = QdrantStore(collection=settings.collection_name, dim=embedding_dim, url=settings.qdrant_url)
             except Exception:
                 self.store = InMemoryStore(dim=embedding_dim)
+        elif settings.vector_store == "faiss":
+            try:
+                self.store = FaissStore(dim=embedding_dim)
+            except Exception:
+                self.store = InMemoryStore(dim=embedding_dim)
         else:
             self.store = InMemoryStore(dim=embedding_dim)
 
@@ -223,17 +542,65 @@ class RAGEngine:
             self.llm = StubLLM()
             self.llm_name = "stub"
 
+        # Optional on-disk embedding cache (disabled if data_dir is unwritable)
+        try:
+            self._emb_cache = EmbeddingCache(os.path.join(settings.data_dir, ".cache"), embedding_dim)
+        except Exception:
+            self._emb_cache = None
+
         self.metrics = Metrics()
         self._doc_titles = set()
         self._chunk_count = 0
 
+        # Micro-batcher state, bound lazily to the running event loop
+        self._batch_loop = None
+        self._query_queue = None
+        self._batcher_task = None
+
+        # LRU of query -> embedding; the embedder is fixed per engine, so the
+        # query text alone is a sufficient key
+        self._query_cache = OrderedDict()
+        self._query_cache_max = 1024
+
+        # Restore a persisted in-memory store if the corpus/config fingerprint matches
+        self._store_path = None
+        if isinstance(self.store, InMemoryStore) and self._emb_cache is not None:
+            self._store_path = os.path.join(
+                settings.data_dir, ".cache", f"store-{self._store_fingerprint()}"
+            )
+            # Counters intentionally stay at zero: they track what this
+            # process has ingested, and /api/ingest reports against them.
+            self.store.load(self._store_path)
+
+    def _store_fingerprint(self) -> str:
+        """Fingerprint of everything that invalidates the persisted store."""
+        sig = [self.embedder.cache_tag, str(settings.chunk_size), str(settings.chunk_overlap)]
+        try:
+            for fname in sorted(os.listdir(settings.data_dir)):
+                if fname.lower().endswith((".md", ".txt")):
+                    mtime = os.path.getmtime(os.path.join(settings.data_dir, fname))
+                    sig.append(f"{fname}:{mtime}")
+        except OSError:
+            pass
+        return hashlib.sha256("|".join(sig).encode("utf-8")).hexdigest()[:16]
+
+    def _query_vec_cached(self, query: str):
+        v = self._query_cache.get(query)
+        if v is not None:
+            self._query_cache.move_to_end(query)
+        return v
+
+    def _query_vec_store(self, query: str, v: np.ndarray):
+        self._query_cache[query] = v
+        if len(self._query_cache) > self._query_cache_max:
+            self._query_cache.popitem(last=False)
+
     def ingest_chunks(self, chunks: List[Dict]) -> Tuple[int, int]:
-        vectors = []
         metas = []
         doc_titles_before = set(self._doc_titles)
 
-        for ch in chunks:
-            text = ch["text"]
+        texts = [ch["text"] for ch in chunks]
+        for ch, text in zip(chunks, texts):
             h = doc_hash(text)
             meta = {
                 "id": h,
@@ -242,22 +609,61 @@ class RAGEngine:
                 "section": ch.get("section"),
                 "text": text,
             }
-            v = self.embedder.embed(text)
-            vectors.append(v)
             metas.append(meta)
             self._doc_titles.add(ch["title"])
             self._chunk_count += 1
 
-        self.store.upsert(vectors, metas)
+        # Drop chunks whose hash the store already holds (and in-batch
+        # repeats) before paying any embedding or cache-I/O cost
+        hashes = [m["hash"] for m in metas]
+        try:
+            known = self.store.has_hashes(hashes)
+        except Exception:
+            known = [False] * len(hashes)
+        seen = set()
+        new_idx = []
+        for i, (h, is_known) in enumerate(zip(hashes, known)):
+            if is_known or h in seen:
+                continue
+            seen.add(h)
+            new_idx.append(i)
+
+        if new_idx:
+            # Serve unchanged content from the disk cache; embed only the misses
+            keys = {i: f"{hashes[i]}|{self.embedder.cache_tag}" for i in new_idx}
+            cached = self._emb_cache.get_many(list(keys.values())) if self._emb_cache else {}
+            vectors = {}
+            miss_idx = []
+            for i in new_idx:
+                if keys[i] in cached:
+                    vectors[i] = cached[keys[i]]
+                else:
+                    miss_idx.append(i)
+            if miss_idx:
+                V = self.embedder.embed_batch([texts[i] for i in miss_idx])
+                for j, i in enumerate(miss_idx):
+                    vectors[i] = V[j]
+                if self._emb_cache is not None:
+                    self._emb_cache.put_many([keys[i] for i in miss_idx], V)
+
+            self.store.upsert([vectors[i] for i in new_idx], [metas[i] for i in new_idx])
+            if self._store_path is not None:
+                try:
+                    self.store.save(self._store_path)
+                except Exception:
+                    pass
         return (len(self._doc_titles) - len(doc_titles_before), len(metas))
 
-    def retrieve(self, query: str, k: int = 4) -> List[Dict]:
-        t0 = time.time()
-        qv = self.embedder.embed(query)
-        # Request more results to account for potential duplicates
-        results = self.store.search(qv, k=k*2)
-        self.metrics.add_retrieval((time.time()-t0)*1000.0)
+    @classmethod
+    def _finalize(cls, results: List[Tuple[float, Dict]], k: int) -> List[Dict]:
+        # Stores already guarantee hash-unique rows, so results need no
+        # dedup; keep the old filter as a safety net in debug runs only
+        if __debug__:
+            return cls._select_unique(results, k)
+        return [meta for _, meta in results[:k]]
 
+    @staticmethod
+    def _select_unique(results: List[Tuple[float, Dict]], k: int) -> List[Dict]:
         # Deduplicate results based on hash
         seen_hashes = set()
         unique_results = []
@@ -276,6 +682,85 @@ class RAGEngine:
 
         return unique_results[:k]
 
+    def retrieve(self, query: str, k: int = 4) -> List[Dict]:
+        t0 = time.time()
+        qv = self._query_vec_cached(query)
+        if qv is None:
+            qv = self.embedder.embed(query)
+            self._query_vec_store(query, qv)
+        results = self.store.search(qv, k=k)
+        self.metrics.add_retrieval((time.time()-t0)*1000.0)
+        return self._finalize(results, k)
+
+    async def aretrieve(self, query: str, k: int = 4) -> List[Dict]:
+        """Async retrieve: concurrent queries are coalesced into one
+        embed_batch call (and one search_batch where the store has it)."""
+        t0 = time.time()
+        qv = self._query_vec_cached(query)
+        if qv is not None:
+            # Cache hit skips both the batching window and the encoder.
+            # In-process stores search in microseconds; network-backed ones
+            # (no search_batch) block, so run those in the executor like
+            # _drain_queries does
+            if hasattr(self.store, "search_batch"):
+                results = self.store.search(qv, k=k)
+            else:
+                loop = asyncio.get_running_loop()
+                results = await loop.run_in_executor(None, self.store.search, qv, k)
+            self.metrics.add_retrieval((time.time()-t0)*1000.0)
+            return self._finalize(results, k)
+        loop = asyncio.get_running_loop()
+        if self._batch_loop is not loop:
+            # New/changed event loop (e.g. per-request test loops): rebind
+            self._batch_loop = loop
+            self._query_queue = asyncio.Queue()
+            self._batcher_task = None
+        fut = loop.create_future()
+        await self._query_queue.put((query, k, fut))
+        if self._batcher_task is None or self._batcher_task.done():
+            self._batcher_task = loop.create_task(self._drain_queries())
+        results = await fut
+        self.metrics.add_retrieval((time.time()-t0)*1000.0)
+        return self._finalize(results, k)
+
+    async def _drain_queries(self):
+        while True:
+            await asyncio.sleep(0.005)  # coalescing window
+            batch = []
+            while not self._query_queue.empty():
+                batch.append(self._query_queue.get_nowait())
+            if not batch:
+                return
+            loop = asyncio.get_running_loop()
+            try:
+                Q = await loop.run_in_executor(
+                    None, self.embedder.embed_batch, [q for q, _, _ in batch]
+                )
+                for (q_text, _, _), row in zip(batch, Q):
+                    self._query_vec_store(q_text, row)
+                k_max = max(k for _, k, _ in batch)
+                if hasattr(self.store, "search_batch"):
+                    per_query = self.store.search_batch(Q, k=k_max)
+                else:
+                    # Qdrant searches are blocking network calls; run them in
+                    # the executor so the event loop stays free to serve other
+                    # requests while we wait
+                    per_query = await loop.run_in_executor(
+                        None,
+                        lambda: [self.store.search(qv, k=k) for qv, (_, k, _) in zip(Q, batch)],
+                    )
+                for results, (_, _, fut) in zip(per_query, batch):
+                    if not fut.done():
+                        fut.set_result(results)
+            except Exception as e:
+                for _, _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+            # Catch stragglers that arrived while we were embedding; the
+            # final empty check runs without awaits, so none can slip by
+            if self._query_queue.empty():
+                return
+
     def generate(self, query: str, contexts: List[Dict]) -> str:
         t0 = time.time()
         answer = self.llm.generate(query, contexts)
@@ -293,9 +778,23 @@ class RAGEngine:
         }
 
 # ---- Helpers ----
+def _chunk_doc(args: Tuple[Dict, int, int]) -> List[Dict]:
+    # Module-level so ProcessPoolExecutor can pickle it
+    d, chunk_size, overlap = args
+    return [
+        {"title": d["title"], "section": d["section"], "text": ch}
+        for ch in chunk_text(d["text"], chunk_size, overlap)
+    ]
+
+# Below this, forking workers costs more than the chunking itself
+_PARALLEL_MIN_DOCS = 32
+
 def build_chunks_from_docs(docs: List[Dict], chunk_size: int, overlap: int) -> List[Dict]:
-    out = []
-    for d in docs:
-        for ch in chunk_text(d["text"], chunk_size, overlap):
-            out.append({"title": d["title"], "section": d["section"], "text": ch})
-    return out
+    jobs = [(d, chunk_size, overlap) for d in docs]
+    if len(docs) >= _PARALLEL_MIN_DOCS:
+        # Chunking is CPU-bound and independent per doc; fan out across cores
+        with ProcessPoolExecutor() as pp:
+            per_doc = list(pp.map(_chunk_doc, jobs, chunksize=8))
+    else:
+        per_doc = [_chunk_doc(job) for job in jobs]
+    return [ch for chunks in per_doc for ch in chunks]
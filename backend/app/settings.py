@@ -6,7 +6,7 @@ class Settings(BaseModel):
     llm_provider: str = os.getenv("LLM_PROVIDER", "stub")  # stub | openai | ollama
     openai_api_key: str | None = os.getenv("OPENAI_API_KEY")
     ollama_host: str = os.getenv("OLLAMA_HOST", "http://ollama:11434")
-    vector_store: str = os.getenv("VECTOR_STORE", "qdrant")  # qdrant | memory
+    vector_store: str = os.getenv("VECTOR_STORE", "qdrant")  # qdrant | faiss | memory
     qdrant_url: str = os.getenv("QDRANT_URL", "http://localhost:6333")
     collection_name: str = os.getenv("COLLECTION_NAME", "policy_helper")
     chunk_size: int = int(os.getenv("CHUNK_SIZE", "700"))
@@ -0,0 +1,41 @@
+import numpy as np
+from app.rag import EmbeddingCache
+
+def test_cache_round_trip(tmp_path):
+    """Vectors written with put_many come back unchanged from get_many."""
+    cache = EmbeddingCache(str(tmp_path), dim=4)
+    keys = ["a", "b", "c"]
+    vecs = np.arange(12, dtype="float32").reshape(3, 4)
+    cache.put_many(keys, vecs)
+
+    got = cache.get_many(keys)
+    assert set(got) == set(keys)
+    for i, k in enumerate(keys):
+        assert np.array_equal(got[k], vecs[i])
+
+def test_cache_miss(tmp_path):
+    """Unknown keys are simply absent from the result, not errors."""
+    cache = EmbeddingCache(str(tmp_path), dim=4)
+    assert cache.get_many(["missing"]) == {}
+
+    cache.put_many(["a"], np.ones((1, 4), dtype="float32"))
+    got = cache.get_many(["a", "missing"])
+    assert set(got) == {"a"}
+
+def test_cache_dim_switch(tmp_path):
+    """Reopening the same cache dir with a different dim must not return
+    rows written under the old dim — offsets from one dim point at garbage
+    in the other's layout."""
+    cache4 = EmbeddingCache(str(tmp_path), dim=4)
+    cache4.put_many(["a", "b"], np.arange(8, dtype="float32").reshape(2, 4))
+
+    cache5 = EmbeddingCache(str(tmp_path), dim=5)
+    assert cache5.get_many(["a", "b"]) == {}
+
+    vec5 = np.arange(5, dtype="float32").reshape(1, 5)
+    cache5.put_many(["a"], vec5)
+    assert np.array_equal(cache5.get_many(["a"])["a"], vec5[0])
+
+    # The dim-4 view of key "a" is untouched by the dim-5 writes
+    got4 = cache4.get_many(["a"])
+    assert np.array_equal(got4["a"], np.arange(4, dtype="float32"))